@@ -1,16 +1,30 @@
 from datetime import datetime
 import argparse
-import v20.transaction
 
 def instrument(i):
     return i.replace("/", "_")
 
-def date_time(fmt="%Y-%m-%d %H:%M:%S"):
+def date_time(fmt="%Y-%m-%d %H:%M:%S", cache_size=256):
+    # datetimes are immutable, so parsed values can be shared between calls
+    cache = {}
+
     def parse(s):
+        dt = cache.get(s)
+
+        if dt is not None:
+            return dt
+
         try:
-            return datetime.strptime(s, fmt)
+            dt = datetime.strptime(s, fmt)
         except ValueError:
             msg = "Not a valid date: '{0}'.".format(s)
             raise argparse.ArgumentTypeError(msg)
 
+        if len(cache) >= cache_size:
+            cache.clear()
+
+        cache[s] = dt
+
+        return dt
+
     return parse
@@ -2,7 +2,6 @@ from __future__ import print_function
 import yaml
 import os
 import sys
-import v20
 
 from common import input
 
@@ -207,6 +206,8 @@ class Config(object):
 
         print("> Using personal access token: {}".format(self.token))
 
+        import v20
+
         ctx = v20.Context(
             self.hostname,
             self.port,
@@ -278,6 +279,8 @@ class Config(object):
         """
         Initialize an API context based on the Config instance
         """
+        import v20
+
         ctx = v20.Context(
             self.hostname,
             self.port,
@@ -293,6 +296,8 @@ class Config(object):
         """
         Initialize a streaming API context based on the Config instance
         """
+        import v20
+
         ctx = v20.Context(
             self.streaming_hostname,
             self.port,
@@ -1,7 +1,89 @@
-from datetime import datetime
 import argparse
 import common.args
-import v20.transaction
+
+
+_TIF_CHOICES = ("FOK", "IOC", "GTC", "GFD", "GTD")
+
+_POSITION_FILL_CHOICES = (
+    "DEFAULT", "OPEN_ONLY", "REDUCE_FIRST", "REDUCE_ONLY"
+)
+
+_DATE_TIME_TYPE = common.args.date_time()
+
+#
+# Client extension arguments as (flags, dest, ClientExtensions kwarg, help)
+#
+_CLIENT_ORDER_FIELDS = (
+    (
+        ("--client-order-id", "--coi"),
+        "client_order_id",
+        "id",
+        "The client-provided ID to assign to the Order"
+    ),
+    (
+        ("--client-order-tag", "--cot"),
+        "client_order_tag",
+        "tag",
+        "The client-provided tag to assign to the Order"
+    ),
+    (
+        ("--client-order-comment", "--coc"),
+        "client_order_comment",
+        "comment",
+        "The client-provided comment to assign to the Order"
+    ),
+)
+
+_CLIENT_TRADE_FIELDS = (
+    (
+        ("--client-trade-id", "--cti"),
+        "client_trade_id",
+        "id",
+        "The client-provided ID to assign a Trade opened by the Order"
+    ),
+    (
+        ("--client-trade-tag", "--ctt"),
+        "client_trade_tag",
+        "tag",
+        "The client-provided tag to assign to a Trade opened by the Order"
+    ),
+    (
+        ("--client-trade-comment", "--ctc"),
+        "client_trade_comment",
+        "comment",
+        "The client-provided comment to assign to a Trade opened by the Order"
+    ),
+)
+
+
+#
+# v20.transaction classes resolved so far by _transaction_class()
+#
+_TRANSACTION_CLASSES = {}
+
+
+def _transaction_class(name):
+    """
+    Look up a class from v20.transaction, importing the module on first use
+    """
+    cls = _TRANSACTION_CLASSES.get(name)
+
+    if cls is None:
+        import v20.transaction
+
+        cls = _TRANSACTION_CLASSES[name] = getattr(v20.transaction, name)
+
+    return cls
+
+
+def format_datetime(dt):
+    """
+    Format a datetime as the RFC 3339 string expected by the v20 API
+    """
+    return "%04d-%02d-%02dT%02d:%02d:%02d.000000000Z" % (
+        dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second
+    )
+
 
 def add_replace_order_id_argument(parser):
     """
@@ -23,6 +105,13 @@ class OrderArguments(object):
     used to configure Order creation
     """
 
+    __slots__ = (
+        "parser",
+        "parsed_args",
+        "param_parsers",
+        "datetime_formatter",
+    )
+
     def __init__(self, parser):
         # Store the argument parser to add arguments to
         self.parser = parser
@@ -36,7 +125,7 @@ class OrderArguments(object):
         self.param_parsers = []
 
         # The default formatter for arguments that are parsed as datetimes
-        self.datetime_formatter = lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+        self.datetime_formatter = format_datetime
 
 
     def set_datetime_formatter(self, datetime_formatter):
@@ -50,8 +139,10 @@ class OrderArguments(object):
         Call each param parser with the parsed arguments to extract the value
         into the parsed_args
         """
+        values = vars(args)
+
         for parser in self.param_parsers:
-            parser(args)
+            parser(values)
 
 
     def add_trade_id(self):
@@ -63,19 +154,19 @@ class OrderArguments(object):
             )
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_trade_id(args)
-        )
+        self.param_parsers.append(self.parse_trade_id)
 
 
-    def parse_trade_id(self, args):
-        if args.tradeid is None:
+    def parse_trade_id(self, values):
+        tradeid = values.get("tradeid")
+
+        if tradeid is None:
             return
 
-        if args.trade.id[0] == '@':
-            self.parsed_args["clientTradeID"] = args.tradeid[1:]
+        if tradeid.startswith('@'):
+            self.parsed_args["clientTradeID"] = tradeid[1:]
         else:
-            self.parsed_args["tradeID"] = args.tradeid
+            self.parsed_args["tradeID"] = tradeid
 
 
     def add_instrument(self):
@@ -85,16 +176,16 @@ class OrderArguments(object):
             help="The instrument to place the Order for"
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_instrument(args)
-        )
+        self.param_parsers.append(self.parse_instrument)
+
 
+    def parse_instrument(self, values):
+        instrument = values.get("instrument")
 
-    def parse_instrument(self, args):
-        if args.instrument is None:
+        if instrument is None:
             return
 
-        self.parsed_args["instrument"] = args.instrument
+        self.parsed_args["instrument"] = instrument
 
 
     def add_units(self):
@@ -106,16 +197,16 @@ class OrderArguments(object):
             )
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_units(args)
-        )
+        self.param_parsers.append(self.parse_units)
+
 
+    def parse_units(self, values):
+        units = values.get("units")
 
-    def parse_units(self, args):
-        if args.units is None:
+        if units is None:
             return
 
-        self.parsed_args["units"] = args.units
+        self.parsed_args["units"] = units
 
 
     def add_price(self):
@@ -124,16 +215,16 @@ class OrderArguments(object):
             help="The price threshold for the Order"
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_price(args)
-        )
+        self.param_parsers.append(self.parse_price)
+
 
+    def parse_price(self, values):
+        price = values.get("price")
 
-    def parse_price(self, args):
-        if args.price is None:
+        if price is None:
             return
 
-        self.parsed_args["price"] = args.price
+        self.parsed_args["price"] = price
 
 
     def add_distance(self):
@@ -142,19 +233,19 @@ class OrderArguments(object):
             help="The price distance for the Order"
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_distance(args)
-        )
+        self.param_parsers.append(self.parse_distance)
 
 
-    def parse_distance(self, args):
-        if args.distance is None:
+    def parse_distance(self, values):
+        distance = values.get("distance")
+
+        if distance is None:
             return
 
-        self.parsed_args["distance"] = args.distance
+        self.parsed_args["distance"] = distance
 
 
-    def add_time_in_force(self, choices=["FOK", "IOC", "GTC", "GFD", "GTD"]):
+    def add_time_in_force(self, choices=_TIF_CHOICES):
         self.parser.add_argument(
             "--time-in-force", "--tif",
             choices=choices,
@@ -164,35 +255,37 @@ class OrderArguments(object):
         if "GTD" in choices:
             self.parser.add_argument(
                 "--gtd-time",
-                type=common.args.date_time(),
+                type=_DATE_TIME_TYPE,
                 help=(
                     "The date to use when the time-in-force is GTD. "
                     "Format is 'YYYY-MM-DD HH:MM:SS"
                 )
             )
 
-        self.param_parsers.append(
-            lambda args: self.parse_time_in_force(args)
-        )
+        self.param_parsers.append(self.parse_time_in_force)
+
 
+    def parse_time_in_force(self, values):
+        time_in_force = values.get("time_in_force")
 
-    def parse_time_in_force(self, args):
-        if args.time_in_force is None:
+        if time_in_force is None:
             return
 
-        self.parsed_args["timeInForce"] = args.time_in_force
+        self.parsed_args["timeInForce"] = time_in_force
 
-        if args.time_in_force != "GTD":
+        if time_in_force != "GTD":
             return
 
-        if args.gtd_time is None:
+        gtd_time = values.get("gtd_time")
+
+        if gtd_time is None:
             self.parser.error(
                 "must set --gtd-time \"YYYY-MM-DD HH:MM:SS\" when "
                 "--time-in-force=GTD"
             )
             return
             
-        self.parsed_args["gtdTime"] = self.datetime_formatter(args.gtd_time)
+        self.parsed_args["gtdTime"] = self.datetime_formatter(gtd_time)
         
 
     def add_price_bound(self):
@@ -201,130 +294,93 @@ class OrderArguments(object):
             help="The worst price bound allowed for the Order"
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_price_bound(args)
-        )
+        self.param_parsers.append(self.parse_price_bound)
         
 
-    def parse_price_bound(self, args):
-        if args.price_bound is None:
+    def parse_price_bound(self, values):
+        price_bound = values.get("price_bound")
+
+        if price_bound is None:
             return
 
-        self.parsed_args["priceBound"] = args.price_bound
+        self.parsed_args["priceBound"] = price_bound
 
 
     def add_position_fill(self):
         self.parser.add_argument(
             "--position-fill",
-            choices=["DEFAULT", "OPEN_ONLY", "REDUCE_FIRST", "REDUCE_ONLY"],
+            choices=_POSITION_FILL_CHOICES,
             required=False,
             help="Specification of how the Order may affect open positions."
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_position_fill(args)
-        )
-
+        self.param_parsers.append(self.parse_position_fill)
 
-    def parse_position_fill(self, args):
-        if args.position_fill is None:
-            return
 
-        self.parsed_args["positionFill"] = args.position_fill
+    def parse_position_fill(self, values):
+        position_fill = values.get("position_fill")
 
+        if position_fill is None:
+            return
 
-    def add_client_order_extensions(self):
-        self.parser.add_argument(
-            "--client-order-id", "--coi",
-            help="The client-provided ID to assign to the Order"
-        )
+        self.parsed_args["positionFill"] = position_fill
 
-        self.parser.add_argument(
-            "--client-order-tag", "--cot",
-            help="The client-provided tag to assign to the Order"
-        )
 
-        self.parser.add_argument(
-            "--client-order-comment", "--coc",
-            help="The client-provided comment to assign to the Order"
-        )
+    def _add_client_extensions(self, fields):
+        for flags, dest, _, help in fields:
+            self.parser.add_argument(*flags, dest=dest, help=help)
 
-        self.param_parsers.append(
-            lambda args: self.parse_client_order_extensions(args)
-        )
 
+    def _parse_client_extensions(self, values, fields, key):
+        kwargs = {
+            name: values[dest]
+            for _, dest, name, _ in fields
+            if values.get(dest) is not None
+        }
 
-    def parse_client_order_extensions(self, args):
-        if (args.client_order_id is None and
-            args.client_order_tag is None and
-            args.client_order_comment is None):
+        if not kwargs:
             return
-        
-        kwargs = {}
 
-        if args.client_order_id is not None:
-            kwargs["id"] = args.client_order_id
+        self.parsed_args[key] = _transaction_class("ClientExtensions")(
+            **kwargs
+        )
 
-        if args.client_order_tag is not None:
-            kwargs["tag"] = args.client_order_tag
 
-        if args.client_order_comment is not None:
-            kwargs["comment"] = args.client_order_comment
+    def add_client_order_extensions(self):
+        self._add_client_extensions(_CLIENT_ORDER_FIELDS)
 
-        self.parsed_args["clientExtensions"] = \
-            v20.transaction.ClientExtensions(
-                **kwargs
-            )
+        self.param_parsers.append(self.parse_client_order_extensions)
 
 
-    def add_client_trade_extensions(self):
-        self.parser.add_argument(
-            "--client-trade-id", "--cti",
-            help="The client-provided ID to assign a Trade opened by the Order"
-        )
-
-        self.parser.add_argument(
-            "--client-trade-tag", "--ctt",
-            help=(
-                "The client-provided tag to assign to a Trade opened by the "
-                "Order"
-            )
+    def parse_client_order_extensions(self, values):
+        self._parse_client_extensions(
+            values, _CLIENT_ORDER_FIELDS, "clientExtensions"
         )
 
-        self.parser.add_argument(
-            "--client-trade-comment", "--ctc",
-            help=(
-                "The client-provided comment to assign to a Trade opened by "
-                "the Order"
-            )
-        )
 
-        self.param_parsers.append(
-            lambda args: self.parse_client_trade_extensions(args)
-        )
+    def add_client_trade_extensions(self):
+        self._add_client_extensions(_CLIENT_TRADE_FIELDS)
 
+        self.param_parsers.append(self.parse_client_trade_extensions)
 
-    def parse_client_trade_extensions(self, args):
-        if (args.client_trade_id is None and
-            args.client_trade_tag is None and
-            args.client_trade_comment is None):
-            return None
-        
-        kwargs = {}
 
-        if args.client_trade_id is not None:
-            kwargs["id"] = args.client_trade_id
+    def parse_client_trade_extensions(self, values):
+        self._parse_client_extensions(
+            values, _CLIENT_TRADE_FIELDS, "tradeClientExtensions"
+        )
 
-        if args.client_trade_tag is not None:
-            kwargs["tag"] = args.client_trade_tag
 
-        if args.client_trade_comment is not None:
-            kwargs["comment"] = args.client_trade_comment
+    def _parse_on_fill(self, value, key, details_class, field):
+        """
+        Store a single-field v20 on-fill details object under key in the
+        parsed_args when value has been provided
+        """
+        if value is None:
+            return
 
-        self.parsed_args["tradeClientExtensions"] = \
-            v20.transaction.ClientExtensions(
-                **kwargs
-            )
+        self.parsed_args[key] = _transaction_class(details_class)(
+            **{field: value}
+        )
 
 
     def add_take_profit_on_fill(self):
@@ -336,21 +392,16 @@ class OrderArguments(object):
             )
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_take_profit_on_fill(args)
-        )
-
+        self.param_parsers.append(self.parse_take_profit_on_fill)
 
-    def parse_take_profit_on_fill(self, args):
-        if args.take_profit_price is None:
-            return
-        
-        kwargs = {}
 
-        kwargs["price"] = args.take_profit_price
-
-        self.parsed_args["takeProfitOnFill"] = \
-            v20.transaction.TakeProfitDetails(**kwargs)
+    def parse_take_profit_on_fill(self, values):
+        self._parse_on_fill(
+            values.get("take_profit_price"),
+            "takeProfitOnFill",
+            "TakeProfitDetails",
+            "price"
+        )
 
 
     def add_stop_loss_on_fill(self):
@@ -362,21 +413,16 @@ class OrderArguments(object):
             )
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_stop_loss_on_fill(args)
-        )
+        self.param_parsers.append(self.parse_stop_loss_on_fill)
 
 
-    def parse_stop_loss_on_fill(self, args):
-        if args.stop_loss_price is None:
-            return
-        
-        kwargs = {}
-
-        kwargs["price"] = args.stop_loss_price
-
-        self.parsed_args["stopLossOnFill"] = \
-            v20.transaction.StopLossDetails(**kwargs)
+    def parse_stop_loss_on_fill(self, values):
+        self._parse_on_fill(
+            values.get("stop_loss_price"),
+            "stopLossOnFill",
+            "StopLossDetails",
+            "price"
+        )
 
 
     def add_trailing_stop_loss_on_fill(self):
@@ -388,20 +434,13 @@ class OrderArguments(object):
             )
         )
 
-        self.param_parsers.append(
-            lambda args: self.parse_trailing_stop_loss_on_fill(args)
-        )
-
+        self.param_parsers.append(self.parse_trailing_stop_loss_on_fill)
 
-    def parse_trailing_stop_loss_on_fill(self, args):
-        if args.trailing_stop_loss_distance is None:
-            return
-        
-        kwargs = {}
-
-        kwargs["distance"] = args.stop_loss_distance
 
-        self.parsed_args["trailingStopLossOnFill"] = \
-            v20.transaction.TrailingStopLossDetails(
-                **kwargs
-            )
+    def parse_trailing_stop_loss_on_fill(self, values):
+        self._parse_on_fill(
+            values.get("trailing_stop_loss_distance"),
+            "trailingStopLossOnFill",
+            "TrailingStopLossDetails",
+            "distance"
+        )
@@ -3,7 +3,6 @@
 import argparse
 import common.config
 from .args import OrderArguments
-from v20.order import MarketOrderRequest
 from .view import print_order_create_response_transactions
 
 